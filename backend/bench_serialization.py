@@ -0,0 +1,111 @@
+"""
+Benchmark for the log-heavy read endpoints.
+
+Compares the old path (ORM objects -> Pydantic IVRLogOut/PatientOut -> json)
+against the fast path (column-only rows -> dicts -> orjson), and reports
+bytes on the wire with and without gzip.
+
+Usage:
+    python bench_serialization.py [--patients 200] [--history 30 90 365]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+# database.py needs a URL at import time; the benchmark itself uses in-memory SQLite
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine
+import crud, models, schemas
+from ml_engine import calculate_risk_and_shap
+from serializers import dumps, log_rows_to_dicts, patient_rows_to_dicts
+
+TRACKS = {
+    "Cardiovascular": ["chest_discomfort", "dizziness", "shortness_of_breath", "weight_gain", "leg_swelling", "palpitations"],
+    "Pulmonary": ["rest_dyspnea", "chest_tightness", "exertional_dyspnea", "wheezing", "cough_increase", "phlegm_change"],
+    "General": ["confusion", "fever_chills", "condition_worsened", "nausea_vomiting", "new_pain", "fatigue"],
+}
+
+
+def seed(db, n_patients: int, history: int):
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=history)
+    for i in range(n_patients):
+        track = rng.choice(list(TRACKS))
+        patient = models.Patient(name=f"Patient {i}", phone_number=f"+1555{i:07d}", disease_track=track, enrolled_on=start)
+        db.add(patient)
+        db.flush()
+        for day in range(history):
+            symptoms = {f: rng.choice(["Yes", "No"]) for f in TRACKS[track]}
+            score, shap = calculate_risk_and_shap(track, symptoms)
+            db.add(models.IVRLog(
+                patient_id=patient.id, symptoms=symptoms, shap=shap, risk_score=score,
+                doctor_status=rng.choice(["Pending", "Reviewed"]),
+                doctor_notes="Follow up by phone" if day % 7 == 0 else None,
+                created_at=start + timedelta(days=day, minutes=rng.randint(0, 600)),
+            ))
+    db.commit()
+
+
+def slow_logs(db, pid):
+    logs = crud.get_all_logs(db, pid)
+    payload = [schemas.IVRLogOut.model_validate(l).model_dump(mode="json") for l in logs]
+    return json.dumps(payload).encode("utf-8")
+
+
+def fast_logs(db, pid):
+    return dumps(log_rows_to_dicts(crud.get_log_rows(db, pid)))
+
+
+def slow_patients(db):
+    patients = crud.get_patients(db)
+    payload = [schemas.PatientOut.model_validate(p).model_dump(mode="json") for p in patients]
+    return json.dumps(payload).encode("utf-8")
+
+
+def fast_patients(db):
+    return dumps(patient_rows_to_dicts(crud.get_patient_rows(db)))
+
+
+def timed(fn, *args, repeat: int = 20):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, body
+
+
+def report(label, slow, fast):
+    (t_slow, b_slow), (t_fast, b_fast) = slow, fast
+    assert json.loads(b_slow) == json.loads(b_fast), f"{label}: fast path changed the payload"
+    print(f"  {label:<10} slow {t_slow * 1000:8.2f} ms  fast {t_fast * 1000:8.2f} ms  "
+          f"speedup {t_slow / t_fast:5.1f}x  |  bytes {len(b_fast):>9,}  gzip {len(gzip.compress(b_fast)):>8,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--history", type=int, nargs="+", default=[30, 90, 365])
+    args = parser.parse_args()
+
+    for history in args.history:
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.patients, history)
+        print(f"{args.patients} patients, {history} check-ins each")
+        report("all-logs", timed(slow_logs, db, 1), timed(fast_logs, db, 1))
+        report("patients", timed(slow_patients, db), timed(fast_patients, db))
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# --- CALLING WINDOW & CAPACITY ---
+# Calls go out between CALL_WINDOW_START and CALL_WINDOW_END (local hours),
+# in SLOT_MINUTES slots. Each slot dials at most CALL_CONCURRENCY patients
+# so we stay within our Twilio concurrency limit.
+CALL_WINDOW_START = int(os.getenv("CALL_WINDOW_START", "9"))
+CALL_WINDOW_END = int(os.getenv("CALL_WINDOW_END", "19"))
+SLOT_MINUTES = int(os.getenv("CALL_SLOT_MINUTES", "15"))
+CALL_CONCURRENCY = int(os.getenv("CALL_CONCURRENCY", "10"))
+
+# Missed calls (busy / no-answer / failed) are retried after a delay,
+# up to MAX_ATTEMPTS dials per patient per day.
+RETRY_DELAY_MINUTES = int(os.getenv("CALL_RETRY_DELAY_MINUTES", "120"))
+MAX_ATTEMPTS = int(os.getenv("CALL_MAX_ATTEMPTS", "3"))
+
+# Used for patients with no call history yet (matches the old fixed 10:00 call)
+DEFAULT_HOUR = 10
+
+# Twilio CallStatus before the status callback arrives (call still ringing or live).
+# Whether a finished dial reached the patient is decided by its check-in, not
+# the status: voicemail and early hang-ups are reported as "completed" too.
+PENDING = "queued"
+
+
+def slot_starts(day: datetime):
+    """All slot start times for a given day inside the calling window."""
+    start = day.replace(hour=CALL_WINDOW_START, minute=0, second=0, microsecond=0)
+    end = day.replace(hour=CALL_WINDOW_END, minute=0, second=0, microsecond=0)
+    slots = []
+    while start < end:
+        slots.append(start)
+        start += timedelta(minutes=SLOT_MINUTES)
+    return slots
+
+
+def answer_rate(answered: int, attempts: int) -> float:
+    """Laplace-smoothed answer rate so a single lucky call doesn't dominate."""
+    return (answered + 1) / (attempts + 2)
+
+
+def best_hour(hour_stats: dict, default: int = DEFAULT_HOUR) -> int:
+    """
+    Picks the in-window hour with the highest smoothed answer rate.
+    hour_stats maps hour -> (answered, attempts). Hours we have never
+    tried score answer_rate(0, 0) = 0.5, so once a patient keeps missing
+    their usual hour the planner moves on to an untried one. Ties go to
+    the hour closest to `default`, so new patients start at 10:00 and
+    exploration widens outwards from there.
+    """
+    hours = sorted(range(CALL_WINDOW_START, CALL_WINDOW_END), key=lambda h: (abs(h - default), h))
+    best, best_rate = None, -1.0
+    for hour in hours:
+        rate = answer_rate(*hour_stats.get(hour, (0, 0)))
+        if rate > best_rate:
+            best, best_rate = hour, rate
+    return best if best is not None else default
+
+
+def plan_day(day: datetime, patient_ids, stats: dict, capacity: int = CALL_CONCURRENCY, earliest: datetime = None):
+    """
+    Assigns each patient to a slot on `day`, preferring their best answer hour.
+    stats maps patient_id -> {hour: (answered, attempts)}.
+    Slots starting before `earliest` are skipped (used when planning mid-day).
+    Returns {slot_start: [patient_id, ...]} with at most `capacity` per slot,
+    except when every slot is full, in which case the least-loaded slot takes the overflow.
+    """
+    slots = [s for s in slot_starts(day) if earliest is None or s >= earliest]
+    if not slots:
+        return {}
+    plan = {s: [] for s in slots}
+
+    for pid in patient_ids:
+        hour = best_hour(stats.get(pid, {}))
+        anchor = day.replace(hour=hour, minute=0, second=0, microsecond=0)
+        # Nearest slots first, starting from the preferred hour
+        ordered = sorted(slots, key=lambda s: (abs((s - anchor).total_seconds()), s))
+        target = next((s for s in ordered if len(plan[s]) < capacity), None)
+        if target is None:
+            target = min(slots, key=lambda s: len(plan[s]))
+        plan[target].append(pid)
+
+    return {s: pids for s, pids in plan.items() if pids}
+
+
+def build_stats(rows):
+    """
+    Folds (patient_id, hour, reached) rows from crud.get_call_outcomes into
+    {patient_id: {hour: (answered, attempts)}}.
+    """
+    counts = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for pid, hour, reached in rows:
+        entry = counts[pid][hour]
+        entry[1] += 1
+        if reached:
+            entry[0] += 1
+    return {pid: {h: tuple(v) for h, v in hours.items()} for pid, hours in counts.items()}
+
+
+def due_retries(calls, now: datetime, delay_minutes: int = RETRY_DELAY_MINUTES, max_attempts: int = MAX_ATTEMPTS):
+    """
+    Works out which patients should be redialled.
+    calls are today's (patient_id, attempt, status, reached, created_at) rows, oldest first.
+    A patient is due when their latest dial finished at least `delay_minutes` ago
+    without a completed check-in, none earlier today reached them either, and
+    they still have attempts left.
+    Returns [(patient_id, next_attempt), ...], longest-waiting first.
+    """
+    latest, answered = {}, set()
+    for pid, attempt, status, reached, created_at in calls:
+        latest[pid] = (attempt, status, created_at)
+        if reached:
+            answered.add(pid)
+
+    cutoff = now - timedelta(minutes=delay_minutes)
+    due = [
+        (created_at, pid, attempt + 1)
+        for pid, (attempt, status, created_at) in latest.items()
+        if pid not in answered and status != PENDING
+        and created_at <= cutoff and attempt < max_attempts
+    ]
+    return [(pid, attempt) for _, pid, attempt in sorted(due)]
@@ -1,8 +1,11 @@
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 import models
-from models import Patient, IVRLog
+from models import Patient, IVRLog, CallAttempt
 from datetime import datetime
+from events import hub, log_event
+from serializers import LOG_FIELDS, PATIENT_FIELDS
 
 # --- PATIENT MANAGEMENT ---
 
@@ -26,6 +29,11 @@ def get_patients(db: Session):
     """Returns all active patients for the dashboard."""
     return db.query(Patient).filter(Patient.active == True).all()
 
+def get_patient_rows(db: Session):
+    """Column-only version of get_patients for the fast serialization path."""
+    columns = [getattr(Patient, f) for f in PATIENT_FIELDS]
+    return db.query(*columns).filter(Patient.active == True).all()
+
 def delete_patient(db: Session, pid: int):
     """Permanently deletes a patient and all their history via cascade."""
     patient = db.query(Patient).filter(Patient.id == pid).first()
@@ -75,9 +83,12 @@ def finalize_risk_score(db: Session, patient_id: int, risk_score: float, shap_da
     if log:
         log.risk_score = risk_score
         log.shap = shap_data
+        log.finalized_at = datetime.utcnow()
         flag_modified(log, "shap")
         db.commit()
         db.refresh(log)
+        # Push the completed check-in to any connected dashboards
+        hub.publish(log_event("checkin_completed", log))
     return log
 
 # --- DOCTOR-IN-THE-LOOP (VERIFICATION) ---
@@ -94,6 +105,7 @@ def update_log_status(db: Session, log_id: int, status: str, notes: str):
         log.reviewed_at = datetime.utcnow()
         db.commit()
         db.refresh(log)
+        hub.publish(log_event("log_reviewed", log))
         return log
     return None
 
@@ -102,3 +114,91 @@ def get_all_logs(db: Session, patient_id: int):
     return db.query(IVRLog).filter(
         IVRLog.patient_id == patient_id
     ).order_by(IVRLog.created_at.desc()).all()
+
+def get_log_rows(db: Session, patient_id: int):
+    """Column-only version of get_all_logs; returns plain tuples in LOG_FIELDS order."""
+    columns = [getattr(IVRLog, f) for f in LOG_FIELDS]
+    return db.query(*columns).filter(
+        IVRLog.patient_id == patient_id
+    ).order_by(IVRLog.created_at.desc()).all()
+
+def get_risk_trends(db: Session, since: datetime):
+    """
+    (patient_id, created_at, risk_score) for every finalized log since `since`, for trend sparklines.
+    Placeholder logs from calls that never finished would otherwise show up as 0% dips.
+    """
+    return db.query(IVRLog.patient_id, IVRLog.created_at, IVRLog.risk_score).filter(
+        IVRLog.created_at >= since,
+        IVRLog.finalized_at != None
+    ).order_by(IVRLog.patient_id, IVRLog.created_at).all()
+
+# --- CALL OUTCOMES (ADAPTIVE SCHEDULING) ---
+
+def record_call_attempt(db: Session, patient_id: int, call_sid: str, attempt: int = 1, log_id: int = None):
+    """
+    Stores a dial as soon as Twilio accepts it; the status callback fills in the outcome.
+    A fast busy/failed callback can arrive before this runs and insert the row
+    itself, so an existing row for the SID is updated instead of duplicated.
+    """
+    call = None
+    if call_sid:
+        call = db.query(CallAttempt).filter(CallAttempt.call_sid == call_sid).first()
+    if call:
+        call.attempt = attempt
+        call.log_id = log_id
+        db.commit()
+        return call
+
+    call = CallAttempt(
+        patient_id=patient_id,
+        call_sid=call_sid,
+        log_id=log_id,
+        attempt=attempt,
+        dial_hour=datetime.now().hour,
+        status="queued" if call_sid else "failed",
+        created_at=datetime.utcnow()
+    )
+    db.add(call)
+    try:
+        db.commit()
+    except IntegrityError:
+        # The status callback inserted the same SID between our lookup and commit
+        db.rollback()
+        call = db.query(CallAttempt).filter(CallAttempt.call_sid == call_sid).first()
+        call.attempt = attempt
+        call.log_id = log_id
+        db.commit()
+    return call
+
+def update_call_status(db: Session, call_sid: str, status: str, duration: int = None):
+    """Records the final Twilio CallStatus for a dial."""
+    call = db.query(CallAttempt).filter(CallAttempt.call_sid == call_sid).first()
+    if call:
+        call.status = status
+        call.duration = duration
+        call.completed_at = datetime.utcnow()
+        db.commit()
+    return call
+
+def get_call_outcomes(db: Session, since: datetime):
+    """
+    (patient_id, dial_hour, reached) for every finished dial since `since`.
+    A dial only counts as reached if its check-in was finalized: Twilio reports
+    "completed" for voicemail and early hang-ups too.
+    """
+    reached = IVRLog.finalized_at.isnot(None).label("reached")
+    return db.query(CallAttempt.patient_id, CallAttempt.dial_hour, reached).outerjoin(
+        IVRLog, CallAttempt.log_id == IVRLog.id
+    ).filter(
+        CallAttempt.created_at >= since,
+        CallAttempt.status != "queued"
+    ).all()
+
+def get_calls_since(db: Session, since: datetime):
+    """(patient_id, attempt, status, reached, created_at) for today's dials, oldest first."""
+    reached = IVRLog.finalized_at.isnot(None).label("reached")
+    return db.query(
+        CallAttempt.patient_id, CallAttempt.attempt, CallAttempt.status, reached, CallAttempt.created_at
+    ).outerjoin(
+        IVRLog, CallAttempt.log_id == IVRLog.id
+    ).filter(CallAttempt.created_at >= since).order_by(CallAttempt.created_at).all()
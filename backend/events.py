@@ -0,0 +1,127 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Each dashboard gets its own bounded queue so one slow browser tab
+# can never hold up the IVR webhooks that publish into the hub.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def resync_event(event_id: int, reason: str) -> dict:
+    """Tells a dashboard it has missed events and must refetch everything."""
+    return {"type": "resync", "id": event_id, "reason": reason, "ts": datetime.utcnow().isoformat()}
+
+
+class Subscriber:
+    """A single connected dashboard and the event loop that serves it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, start_id: int, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.loop = loop
+        self.start_id = start_id  # Last event id published before this subscriber joined
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, event: dict):
+        # Runs on the subscriber's loop. Every event is a different log, so
+        # when the queue is full we can't just drop one: we discard the
+        # backlog and queue a single resync so the dashboard refetches in full.
+        if self.queue.full():
+            backlog = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += backlog + 1
+            logger.warning(f"Dashboard queue overflowed; sending resync instead of {backlog + 1} events")
+            event = resync_event(event["id"], "overflow")
+        self.queue.put_nowait(event)
+
+
+class BroadcastHub:
+    """
+    In-process fan-out of check-in events to every connected dashboard.
+    publish() is safe to call from the sync request threads used by the
+    Twilio webhooks and never blocks on a subscriber. Each event gets an
+    increasing id, sent as the SSE frame id, so clients can detect gaps.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def subscribe(self) -> Subscriber:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sub = Subscriber(loop, self._last_id)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: dict):
+        with self._lock:
+            self._last_id += 1
+            event = {**event, "id": self._last_id}
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # The subscriber's loop is gone; clean it up.
+                self.unsubscribe(sub)
+
+
+hub = BroadcastHub()
+
+
+def log_event(event_type: str, log) -> dict:
+    """Builds the compact payload sent to dashboards for a changed IVR log."""
+    return {
+        "type": event_type,
+        "log_id": log.id,
+        "patient_id": log.patient_id,
+        "risk_score": log.risk_score,
+        "doctor_status": log.doctor_status,
+        "ts": datetime.utcnow().isoformat(),
+    }
+
+
+def format_sse(event: dict) -> str:
+    """Encodes an event as a Server-Sent Events frame."""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def sse_stream(hub: BroadcastHub, last_event_id: str = None, keepalive: float = 15.0):
+    """
+    Yields SSE frames for a new subscriber, with periodic keep-alive comments.
+    Subscribing happens here rather than in the endpoint so that a client
+    that disconnects before the body is streamed never joins the hub.
+    On reconnect the browser sends Last-Event-ID; if anything was published
+    while it was away (or the server restarted) it gets a resync first.
+    """
+    sub = hub.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        if last_event_id is not None and last_event_id != str(sub.start_id):
+            yield format_sse(resync_event(sub.start_id, "reconnect"))
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(sub)
+        if sub.dropped:
+            logger.info(f"Dashboard stream closed after dropping {sub.dropped} events")
@@ -1,11 +1,17 @@
 import os
-from fastapi import FastAPI, Depends, Form, Query, Response, HTTPException
+from fastapi import FastAPI, Depends, Form, Header, Query, Response, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime, timedelta
 import crud, models, schemas
 from database import SessionLocal, engine
 from twilio_calls import call_patient
-from ml_engine import calculate_risk_and_shap
+from scheduler import start_scheduler, stop_scheduler
+from ml_engine import calculate_risk_and_shap, WEIGHTS_VERSION
+from events import hub, sse_stream
+from serializers import FastJSONResponse, log_rows_to_dicts, patient_rows_to_dicts, trend_rows_to_columns
 
 # Initialize database tables
 models.Base.metadata.drop_all(bind=engine) 
@@ -13,6 +19,22 @@ models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Patient Monitoring IVR System")
 
+# Daily call scheduler runs inside the API process; disable it on extra workers
+RUN_SCHEDULER = os.getenv("RUN_SCHEDULER", "true").lower() == "true"
+
+@app.on_event("startup")
+def on_startup():
+    if RUN_SCHEDULER:
+        start_scheduler()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_scheduler()
+
+# Compress larger JSON bodies (long check-in histories); small replies go out as-is
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+
 # --- SIMPLIFIED FRIENDLY QUESTIONS ---
 FRIENDLY_QUESTIONS = {
     "Cardiovascular": [
@@ -55,13 +77,36 @@ def enroll_patient(patient: schemas.PatientCreate, db: Session = Depends(get_db)
     # crud.create_patient now uses 'phone_number' internally
     return crud.create_patient(db, patient.dict())
 
+# The read endpoints below keep response_model for the documented schema,
+# but return a FastJSONResponse built from column-only rows so the
+# per-row ORM and Pydantic work is skipped.
+
 @app.get("/patients", response_model=List[schemas.PatientOut])
 def list_patients(db: Session = Depends(get_db)):
-    return crud.get_patients(db)
+    return FastJSONResponse(patient_rows_to_dicts(crud.get_patient_rows(db)))
 
 @app.get("/patients/{pid}/all-logs", response_model=List[schemas.IVRLogOut])
 def get_all_logs(pid: int, db: Session = Depends(get_db)):
-    return crud.get_all_logs(db, pid)
+    return FastJSONResponse(log_rows_to_dicts(crud.get_log_rows(db, pid)))
+
+@app.get("/patients/risk-trends")
+def risk_trends(days: int = Query(30, ge=1, le=365), db: Session = Depends(get_db)):
+    """Columnar risk score history for every patient, fetched once per dashboard render."""
+    rows = crud.get_risk_trends(db, datetime.utcnow() - timedelta(days=days))
+    return FastJSONResponse({
+        "weights_version": WEIGHTS_VERSION,
+        "days": days,
+        "trends": trend_rows_to_columns(rows),
+    })
+
+@app.get("/events/checkins")
+async def checkin_events(last_event_id: str = Header(None)):
+    """
+    Server-Sent Events feed of completed and reviewed check-ins for the dashboard.
+    A "resync" event means events were missed and the client should refetch in full.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(sse_stream(hub, last_event_id), media_type="text/event-stream", headers=headers)
 
 # --- DOCTOR-IN-THE-LOOP VERIFICATION ---
 
@@ -89,8 +134,9 @@ def remove_patient(pid: int, db: Session = Depends(get_db)):
 
 @app.post("/call/{phone}")
 def manual_call(phone: str, patient_id: int, db: Session = Depends(get_db)):
-    crud.create_initial_log(db, patient_id)
+    log = crud.create_initial_log(db, patient_id)
     sid = call_patient(phone, patient_id)
+    crud.record_call_attempt(db, patient_id, sid, log_id=log.id)
     return {"status": "Called", "sid": sid}
 
 # --- TWILIO IVR STATE MACHINE ---
@@ -112,6 +158,17 @@ def ivr_start(patient_id: int = Query(...), db: Session = Depends(get_db)):
     """
     return Response(content=twiml, media_type="application/xml")
 
+@app.post("/twilio/status")
+def call_status(patient_id: int = Query(...), CallSid: str = Form(...), CallStatus: str = Form(...),
+                CallDuration: int = Form(None), db: Session = Depends(get_db)):
+    """Twilio status callback: records how each dial ended for adaptive scheduling."""
+    call = crud.update_call_status(db, CallSid, CallStatus, CallDuration)
+    if not call:
+        # Dial placed outside our records (e.g. from the Twilio console); keep it for learning
+        crud.record_call_attempt(db, patient_id, CallSid)
+        crud.update_call_status(db, CallSid, CallStatus, CallDuration)
+    return Response(status_code=204)
+
 @app.post("/twilio/ask")
 def ivr_ask(pid: int = Query(...), idx: int = Query(...), dis: str = Query(...)):
     survey = FRIENDLY_QUESTIONS.get(dis, [])
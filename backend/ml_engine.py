@@ -1,3 +1,5 @@
+import hashlib
+import json
 import pandas as pd
 import numpy as np
 
@@ -28,6 +30,10 @@ CLINICAL_WEIGHTS = {
     "new_pain": 0.25             
 }
 
+# Short fingerprint of the weights above. Stored SHAP values and cached
+# dashboard charts are only comparable within the same version.
+WEIGHTS_VERSION = hashlib.sha1(json.dumps(CLINICAL_WEIGHTS, sort_keys=True).encode()).hexdigest()[:8]
+
 def calculate_risk_and_shap(disease_track, symptoms_dict):
     """
     Calculates track-specific risk and SHAP values.
@@ -24,6 +24,7 @@ class Patient(Base):
 
     # Relationship to allow multiple logs
     ivr_logs = relationship("IVRLog", back_populates="owner", cascade="all, delete-orphan")
+    call_attempts = relationship("CallAttempt", back_populates="patient", cascade="all, delete-orphan")
 
 class IVRLog(Base):
     __tablename__ = "ivr_logs"
@@ -38,6 +39,30 @@ class IVRLog(Base):
     reviewed_at = Column(DateTime, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set by finalize_risk_score; placeholder logs from unanswered calls stay NULL
+    finalized_at = Column(DateTime, nullable=True)
     
     # FIXED: This now matches 'ivr_logs' in the Patient class
     owner = relationship("Patient", back_populates="ivr_logs")
+
+class CallAttempt(Base):
+    """One outbound dial and its final Twilio status, used to learn answer windows."""
+    __tablename__ = "call_attempts"
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), index=True)
+    call_sid = Column(String, unique=True, index=True, nullable=True)
+    # Placeholder check-in created for this dial; it is only finalized if the
+    # patient actually answered the survey (voicemail also reports "completed")
+    log_id = Column(Integer, ForeignKey("ivr_logs.id", ondelete="SET NULL"), nullable=True)
+    attempt = Column(Integer, default=1)  # 1 = first dial of the day, 2+ = retries
+    dial_hour = Column(Integer)  # Local hour the call was placed, for answer-window learning
+
+    # queued -> completed / busy / no-answer / failed / canceled (Twilio CallStatus)
+    status = Column(String, default="queued", index=True)
+    duration = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    patient = relationship("Patient", back_populates="call_attempts")
+    log = relationship("IVRLog")
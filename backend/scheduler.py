@@ -4,6 +4,9 @@ from database import SessionLocal
 from models import Patient
 from twilio_calls import call_patient
 from datetime import datetime, timedelta
+import crud
+import call_planner
+from call_planner import CALL_WINDOW_START, CALL_WINDOW_END, SLOT_MINUTES, CALL_CONCURRENCY
 
 # Setup logging to see the scheduler activity in your Render logs
 logging.basicConfig(level=logging.INFO)
@@ -11,38 +14,124 @@ logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler()
 
-def daily_calls():
+# How far back we look when learning each patient's best answer hour
+LEARNING_DAYS = 30
+
+# Today's plan: {slot_start: [patient_id, ...]}, filled by plan_daily_calls
+_todays_plan = {}
+
+
+def _today_start_utc():
+    """Local midnight expressed in UTC, since call attempts are stored in UTC."""
+    now = datetime.now()
+    return datetime.utcnow() - (now - now.replace(hour=0, minute=0, second=0, microsecond=0))
+
+
+def _current_slot():
+    """Start of the slot we are in right now."""
+    now = datetime.now().replace(second=0, microsecond=0)
+    return now - timedelta(minutes=now.minute % SLOT_MINUTES)
+
+
+def _place_call(db, pid: int, attempt: int):
+    """Dials one patient. Errors are logged and rolled back so the rest of the slot still goes out."""
+    try:
+        patient = crud.get_patient_by_id(db, pid)
+        if not patient or not patient.active:
+            return
+        logger.info(f"Calling {patient.name} (ID: {patient.id}), attempt {attempt}")
+        # Same as manual_call: every dial gets its own placeholder check-in, so
+        # the IVR answers don't overwrite the previous day's finalized log
+        log = crud.create_initial_log(db, patient.id)
+        try:
+            sid = call_patient(patient.phone_number, patient.id)
+        except Exception as e:
+            logger.error(f"Failed to call {patient.phone_number}: {e}")
+            sid = None
+        crud.record_call_attempt(db, patient.id, sid, attempt, log_id=log.id)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to record call for patient {pid}: {e}")
+
+
+def plan_daily_calls():
     """
-    This function runs daily. It finds all active patients 
-    and triggers a Twilio call if they are in their 30-day window.
+    This function runs daily before the calling window opens. It finds all
+    active patients in their 30-day window and spreads their calls over the
+    day, putting each patient in the slot where they usually answer.
     """
     db = SessionLocal()
     try:
         # Fetch only active patients
-        patients = db.query(Patient).filter(Patient.active == True).all()
-        
-        for p in patients:
-            # Only call patients for the first 30 days after enrollment
-            if (datetime.utcnow() - p.enrolled_on).days <= 30:
-                logger.info(f"Triggering scheduled call for {p.name} (ID: {p.id})")
-                
-                # We pass BOTH the phone and the ID
-                # The ID is crucial so main.py knows which disease-track to use
-                try:
-                    call_patient(p.phone, p.id)
-                except Exception as e:
-                    logger.error(f"Failed to call {p.phone}: {e}")
-            else:
-                # Optional: Deactivate patient after 30 days automatically
-                # p.active = False
-                # db.commit()
-                pass
-                
+        patients = db.query(Patient.id, Patient.enrolled_on).filter(Patient.active == True).all()
+        # Only call patients for the first 30 days after enrollment
+        eligible = [pid for pid, enrolled_on in patients if (datetime.utcnow() - enrolled_on).days <= 30]
+
+        # Skip anyone already dialled today (e.g. the server restarted mid-day)
+        already_called = {row[0] for row in crud.get_calls_since(db, _today_start_utc())}
+        eligible = [pid for pid in eligible if pid not in already_called]
+
+        outcomes = crud.get_call_outcomes(db, datetime.utcnow() - timedelta(days=LEARNING_DAYS))
+        stats = call_planner.build_stats(outcomes)
+
+        # Slots that have already started today are skipped
+        _todays_plan.clear()
+        _todays_plan.update(call_planner.plan_day(datetime.now(), eligible, stats, earliest=_current_slot()))
+
+        logger.info(f"Planned {len(eligible)} calls across {len(_todays_plan)} slots")
     finally:
         db.close()
 
-# Schedule the task: Runs every day at 10:00 AM
-scheduler.add_job(daily_calls, "cron", hour=10, minute=0)
 
-# Start the scheduler
-scheduler.start()
+def dial_slot():
+    """
+    Runs at the start of every slot in the calling window. Dials the patients
+    planned for this slot, then fills any spare capacity with retries of
+    missed calls, so at most CALL_CONCURRENCY calls start per slot.
+    """
+    slot = _current_slot()
+    # Anything left over from earlier slots (e.g. a misfired job) goes out now
+    planned = []
+    for s in sorted(s for s in _todays_plan if s <= slot):
+        planned.extend(_todays_plan.pop(s))
+
+    db = SessionLocal()
+    try:
+        for pid in planned:
+            _place_call(db, pid, attempt=1)
+
+        spare = CALL_CONCURRENCY - len(planned)
+        if spare <= 0:
+            return
+        calls = crud.get_calls_since(db, _today_start_utc())
+        for pid, attempt in call_planner.due_retries(calls, datetime.utcnow())[:spare]:
+            _place_call(db, pid, attempt=attempt)
+    finally:
+        db.close()
+
+
+# Plan the day an hour before calls start, then dial slot by slot
+PLAN_HOUR = max(CALL_WINDOW_START - 1, 0)
+
+
+def start_scheduler():
+    """
+    Registers the planning and dialing jobs and starts the scheduler.
+    Called from main.py on app startup. With several API workers only one
+    should run it (set RUN_SCHEDULER=false on the others), or patients get
+    called once per worker.
+    """
+    scheduler.add_job(plan_daily_calls, "cron", hour=PLAN_HOUR, minute=0, id="plan_daily_calls", replace_existing=True)
+    scheduler.add_job(dial_slot, "cron", hour=f"{CALL_WINDOW_START}-{CALL_WINDOW_END - 1}",
+                      minute=f"*/{SLOT_MINUTES}", id="dial_slot", replace_existing=True)
+    scheduler.start()
+
+    # Recover today's plan if we start up after the planning job already ran
+    # (including between planning and the first slot) but before the window closes
+    if PLAN_HOUR <= datetime.now().hour < CALL_WINDOW_END:
+        plan_daily_calls()
+
+
+def stop_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
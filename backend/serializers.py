@@ -0,0 +1,67 @@
+import json
+from datetime import datetime
+from fastapi.responses import Response
+
+# orjson is much faster at encoding and handles datetimes natively.
+# Fall back to the standard library if it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Column order used by the column-only queries in crud.py.
+# Keys and order match schemas.IVRLogOut and schemas.PatientOut.
+LOG_FIELDS = (
+    "patient_id", "symptoms", "shap", "risk_score",
+    "doctor_status", "doctor_notes", "reviewed_at", "id", "created_at",
+)
+PATIENT_FIELDS = (
+    "name", "phone_number", "disease_track", "id", "enrolled_on",
+    "active", "doctor_override", "override_notes",
+)
+
+
+def _default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Encodes plain Python data to JSON bytes using the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def log_rows_to_dicts(rows):
+    """Turns column-only IVRLog rows into dicts shaped like IVRLogOut."""
+    return [dict(zip(LOG_FIELDS, row)) for row in rows]
+
+
+def patient_rows_to_dicts(rows):
+    """Turns column-only Patient rows into dicts shaped like PatientOut."""
+    patients = []
+    for row in rows:
+        patient = dict(zip(PATIENT_FIELDS, row))
+        patient["logs"] = []  # History is served separately by /patients/{pid}/all-logs
+        patients.append(patient)
+    return patients
+
+
+def trend_rows_to_columns(rows):
+    """Groups (patient_id, created_at, risk_score) rows into per-patient timestamp/score columns."""
+    trends = {}
+    for pid, created_at, score in rows:
+        trend = trends.setdefault(str(pid), {"timestamps": [], "scores": []})
+        trend["timestamps"].append(created_at)
+        trend["scores"].append(score)
+    return trends
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips Pydantic validation and encodes with orjson when available."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,132 @@
+"""
+Simulation harness for adaptive call scheduling.
+
+Runs a synthetic patient population through N days of calls twice:
+  * baseline - everyone dialled at 10:00, no retries (the old daily_calls)
+  * adaptive - call_planner slots + learned answer windows + retries
+and compares wasted dials, patients reached and the peak webhook rate.
+
+Each patient has a hidden per-hour answer probability peaking at a random
+hour of the calling window. Only the outcomes of dials are visible to the
+planner: the Twilio status plus whether the check-in was completed, where
+voicemail shows up as "completed" without a check-in.
+
+Usage:
+    python simulate_calls.py [--patients 200] [--days 30] [--seed 7]
+"""
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+
+import call_planner
+from call_planner import CALL_WINDOW_START, CALL_WINDOW_END, SLOT_MINUTES
+
+# An answered call hits /twilio/voice, /twilio/ask, one /twilio/handle per
+# question (6) and the status callback over roughly CALL_MINUTES minutes.
+# A missed call only produces the status callback.
+WEBHOOKS_PER_ANSWERED = 9
+WEBHOOKS_PER_MISSED = 1
+CALL_MINUTES = 2
+
+# Twilio status for dials that did not reach the patient. Voicemail is
+# reported as "completed", so only a finished check-in counts as reached.
+MISSED_STATUSES = ["no-answer", "no-answer", "busy", "completed"]
+
+
+def make_population(n: int, rng: random.Random):
+    """Hidden answer probability per hour for each patient."""
+    population = {}
+    for pid in range(1, n + 1):
+        peak = rng.randint(CALL_WINDOW_START, CALL_WINDOW_END - 1)
+        spread = rng.uniform(1.0, 2.5)
+        floor = rng.uniform(0.05, 0.2)
+        population[pid] = {
+            h: floor + (0.9 - floor) * math.exp(-((h - peak) ** 2) / (2 * spread ** 2))
+            for h in range(24)
+        }
+    return population
+
+
+def webhook_rate(dials, answered):
+    """Peak webhooks per minute produced by one batch of simultaneous dials."""
+    return (answered * WEBHOOKS_PER_ANSWERED + (dials - answered) * WEBHOOKS_PER_MISSED) / CALL_MINUTES
+
+
+class Tally:
+    def __init__(self):
+        self.dials = self.answered = self.reached = self.patient_days = 0
+        self.peak_rate = self.peak_batch = 0.0
+
+    def batch(self, dials, answered):
+        self.dials += dials
+        self.answered += answered
+        self.peak_batch = max(self.peak_batch, dials)
+        self.peak_rate = max(self.peak_rate, webhook_rate(dials, answered))
+
+    def row(self, label):
+        wasted = self.dials - self.answered
+        return (f"  {label:<9} dials {self.dials:>6}  wasted {wasted:>6} ({wasted / max(self.dials, 1):6.1%})  "
+                f"reached {self.reached / max(self.patient_days, 1):6.1%}  "
+                f"peak batch {self.peak_batch:>4.0f}  peak webhooks/min {self.peak_rate:7.1f}")
+
+
+def run_baseline(population, days, rng):
+    tally = Tally()
+    for _ in range(days):
+        answered = sum(rng.random() < probs[10] for probs in population.values())
+        tally.batch(len(population), answered)
+        tally.reached += answered
+        tally.patient_days += len(population)
+    return tally
+
+
+def run_adaptive(population, days, rng, capacity):
+    tally, outcomes = Tally(), []
+    start = datetime(2024, 1, 1)
+    for d in range(days):
+        day = start + timedelta(days=d)
+        stats = call_planner.build_stats(outcomes)
+        plan = call_planner.plan_day(day, list(population), stats, capacity=capacity)
+        calls, reached = [], set()
+
+        for slot in call_planner.slot_starts(day):
+            batch = [(pid, 1) for pid in plan.get(slot, [])]
+            spare = capacity - len(batch)
+            if spare > 0:
+                batch += call_planner.due_retries(calls, slot)[:spare]
+
+            answered = 0
+            for pid, attempt in batch:
+                picked_up = rng.random() < population[pid][slot.hour]
+                status = "completed" if picked_up else rng.choice(MISSED_STATUSES)
+                calls.append((pid, attempt, status, picked_up, slot))
+                outcomes.append((pid, slot.hour, picked_up))
+                if picked_up:
+                    answered += 1
+                    reached.add(pid)
+            if batch:
+                tally.batch(len(batch), answered)
+
+        tally.reached += len(reached)
+        tally.patient_days += len(population)
+    return tally
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--capacity", type=int, default=call_planner.CALL_CONCURRENCY)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    population = make_population(args.patients, random.Random(args.seed))
+    print(f"{args.patients} patients, {args.days} days, {SLOT_MINUTES}-minute slots, "
+          f"{args.capacity} calls per slot, up to {call_planner.MAX_ATTEMPTS} attempts/day")
+    print(run_baseline(population, args.days, random.Random(args.seed)).row("baseline"))
+    print(run_adaptive(population, args.days, random.Random(args.seed), args.capacity).row("adaptive"))
+
+
+if __name__ == "__main__":
+    main()
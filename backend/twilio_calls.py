@@ -24,10 +24,15 @@ def call_patient(phone_number: str, patient_id: int):
     try:
         # 3. Create the call
         # The 'url' tells Twilio where to fetch the TwiML (the voice instructions)
+        # 'status_callback' reports the final outcome (answered, busy, no-answer...)
+        # so the scheduler can learn when each patient picks up
         call = client.calls.create(
             to=phone_number,
             from_=twilio_number,
-            url=f"{backend_url}/twilio/voice?patient_id={patient_id}"
+            url=f"{backend_url}/twilio/voice?patient_id={patient_id}",
+            status_callback=f"{backend_url}/twilio/status?patient_id={patient_id}",
+            status_callback_event=["completed"],
+            status_callback_method="POST"
         )
         
         print(f"Successfully initiated call to {phone_number}. SID: {call.sid}")
@@ -2,7 +2,7 @@ import streamlit as st
 import requests
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
+import charts
 
 # Backend URL configuration
 BACKEND = os.environ.get("BACKEND_URL", "http://localhost:8000")
@@ -85,7 +85,17 @@ def fetch_patients():
         return r.json() if r.status_code == 200 else []
     except: return []
 
+def fetch_risk_trends():
+    # One columnar request for every patient's 30-day scores, instead of per-log lookups
+    try:
+        r = requests.get(f"{BACKEND}/patients/risk-trends", params={"days": 30})
+        return r.json() if r.status_code == 200 else {}
+    except: return {}
+
 patients = fetch_patients()
+trend_data = fetch_risk_trends()
+weights_version = trend_data.get("weights_version", "unknown")
+sparklines = charts.render_sparklines(trend_data.get("trends", {}), weights_version)
 
 for p in patients:
     # Patient Expander Header
@@ -104,6 +114,8 @@ for p in patients:
 
         with col_history:
             st.markdown("### 30-Day Check-in History")
+            if str(p['id']) in sparklines:
+                st.image(sparklines[str(p['id'])], caption="30-day risk trend")
             log_res = requests.get(f"{BACKEND}/patients/{p['id']}/all-logs")
             
             if log_res.status_code == 200:
@@ -132,13 +144,8 @@ for p in patients:
                         if active_drivers:
                             st.write("#### 🧠 Clinical Risk Drivers")
                             
-                            # Professional Matplotlib Chart
-                            fig, ax = plt.subplots(figsize=(6, len(active_drivers)*0.5))
-                            # Sort by weight
-                            sorted_drivers = dict(sorted(active_drivers.items(), key=lambda x: x[1]))
-                            ax.barh(list(sorted_drivers.keys()), list(sorted_drivers.values()), color='#ff4b4b')
-                            ax.set_title("Impact Weight per Symptom")
-                            st.pyplot(fig)
+                            # Cached Matplotlib chart (rendered once per log and weights version)
+                            st.image(charts.driver_chart(log['id'], weights_version, active_drivers))
 
                             # 2. PERFECT EXPLAINABILITY TEXT (WHAT & SOURCE)
                             st.write("#### 📋 Medical Justification")
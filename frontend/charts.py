@@ -0,0 +1,151 @@
+import io
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import matplotlib
+matplotlib.use("Agg")  # Render off-screen; Streamlit only needs the PNG bytes
+import matplotlib.pyplot as plt
+
+# --- CHART CACHES ---
+# Streamlit reruns the whole script on every click, but imported modules
+# stay loaded, so these caches survive across reruns of the dashboard.
+# Driver charts and sparklines have separate caches so that one patient
+# sparkline per rerun can never evict the driver charts.
+MAX_CACHED_DRIVER_CHARTS = 256
+MIN_CACHED_SPARKLINES = 256
+
+
+class ChartCache:
+    """
+    Small LRU cache of rendered PNG bytes keyed by chart identity.
+    Shared by every Streamlit session thread, so all access is locked.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+            return png
+
+    def put(self, key, png: bytes):
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def ensure_capacity(self, size: int):
+        """Grows the cache so it can hold at least `size` charts."""
+        with self._lock:
+            self.maxsize = max(self.maxsize, size)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+driver_cache = ChartCache(MAX_CACHED_DRIVER_CHARTS)
+sparkline_cache = ChartCache(MIN_CACHED_SPARKLINES)
+
+# pyplot keeps global figure state and is not thread-safe, so only one
+# chart is drawn at a time. The lock is held per chart, not per batch,
+# so a cold batch of sparklines doesn't stall other sessions for long.
+_render_lock = threading.Lock()
+
+
+def _to_png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=100)
+    return buf.getvalue()
+
+
+# --- RISK DRIVER BARS (PER LOG) ---
+
+def driver_chart(log_id: int, weights_version: str, drivers: dict) -> bytes:
+    """
+    Horizontal bar chart of the active SHAP drivers for one log.
+    Cached by (log id, weights version) plus the drivers themselves: the
+    backend recreates its tables on restart, so log ids get reused while
+    this process keeps its cache.
+    """
+    key = ("drivers", log_id, weights_version, tuple(sorted(drivers.items())))
+    png = driver_cache.get(key)
+    if png is not None:
+        return png
+
+    # Sort by weight
+    sorted_drivers = dict(sorted(drivers.items(), key=lambda x: x[1]))
+    with _render_lock:
+        fig, ax = plt.subplots(figsize=(6, max(len(sorted_drivers) * 0.5, 1.5)))
+        try:
+            ax.barh(list(sorted_drivers.keys()), list(sorted_drivers.values()), color='#ff4b4b')
+            ax.set_title("Impact Weight per Symptom")
+            png = _to_png(fig)
+        finally:
+            plt.close(fig)
+
+    driver_cache.put(key, png)
+    return png
+
+
+# --- 30-DAY RISK SPARKLINES (PER PATIENT) ---
+
+def _sparkline_key(pid, weights_version: str, trend: dict):
+    # Includes the latest timestamp so a new check-in invalidates the image
+    timestamps = trend.get("timestamps", [])
+    return ("trend", pid, weights_version, len(timestamps), timestamps[-1] if timestamps else None)
+
+
+def render_sparklines(trends: dict, weights_version: str) -> dict:
+    """
+    Renders a risk sparkline for every patient in `trends`
+    ({pid: {"timestamps": [...], "scores": [...]}}, as returned by
+    /patients/risk-trends). The sparkline cache grows to the patient count,
+    so after the first render every rerun is served from cache. Cache misses
+    are drawn on a single reused figure, which is much cheaper than a new
+    figure per patient.
+    Returns {pid: png_bytes}.
+    """
+    sparkline_cache.ensure_capacity(len(trends))
+    images, missing = {}, []
+    for pid, trend in trends.items():
+        png = sparkline_cache.get(_sparkline_key(pid, weights_version, trend))
+        if png is not None:
+            images[pid] = png
+        else:
+            missing.append(pid)
+
+    if not missing:
+        return images
+
+    with _render_lock:
+        fig, ax = plt.subplots(figsize=(4, 0.8))
+    try:
+        for pid in missing:
+            trend = trends[pid]
+            times = [datetime.fromisoformat(t) for t in trend["timestamps"]]
+            with _render_lock:
+                ax.clear()
+                ax.plot(times, trend["scores"], color="#ff4b4b", linewidth=1.5, marker="o", markersize=2)
+                ax.fill_between(times, trend["scores"], color="#ff4b4b", alpha=0.15)
+                ax.set_ylim(0, 100)
+                ax.axhline(60, color="#999999", linewidth=0.5, linestyle="--")  # HIGH risk threshold
+                ax.set_axis_off()
+                png = _to_png(fig)
+            sparkline_cache.put(_sparkline_key(pid, weights_version, trend), png)
+            images[pid] = png
+    finally:
+        with _render_lock:
+            plt.close(fig)
+
+    return images